@@ -151,12 +151,14 @@ class TimeAuditCycle(BaseCycle):
                 key=lambda x: x.get('excess_time', 0),
                 reverse=True
             )[:5]
-            for item in raw_wasters:
-                insights['top_time_wasters'].append({
+            insights['top_time_wasters'] = [
+                {
                     'title': 'Пожиратель времени',
                     'text': f"Лишняя активность: {item.get('title', 'Неизвестно')}",
                     'excess_time': item.get('excess_time', 0)
-                })
+                }
+                for item in raw_wasters
+            ]
         
         # 2. Предложения по оптимизации
         automation_candidates = patterns.get('automation_candidates', [])
@@ -296,19 +298,10 @@ class TimeAuditCycle(BaseCycle):
             if time_wasters_df.empty:
                 return []
             
-            # Формируем результат используя to_dict вместо iterrows
-            time_wasters = time_wasters_df[['task_id', 'title', 'excess_time']].to_dict('records')
-            
-            # Приводим к нужному формату
-            result = []
-            for waster in time_wasters:
-                result.append({
-                    'task_id': str(waster.get('task_id', 'unknown')),
-                    'excess_time': float(waster.get('excess_time', 0)),
-                    'title': str(waster.get('title', 'Без названия'))
-                })
-            
-            return result
+            # Приводим типы целыми колонками и формируем результат одним вызовом to_dict
+            return time_wasters_df[['task_id', 'excess_time', 'title']].astype(
+                {'task_id': str, 'excess_time': float, 'title': str}
+            ).to_dict('records')
             
         except Exception as e:
             logger.error(f"Error finding time wasters: {e}")
@@ -349,7 +342,10 @@ class TimeAuditCycle(BaseCycle):
                 return []
             
             # Группируем задачи по task_id и title и считаем повторения
-            task_counts = df_copy.groupby(['task_id', 'title'], as_index=False, dropna=False).agg(
+            # (группы в порядке первого появления, без сортировки ключей)
+            task_counts = df_copy.groupby(
+                ['task_id', 'title'], as_index=False, dropna=False, sort=False
+            ).agg(
                 repetition_count=('duration', 'count'),
                 avg_duration=('duration', 'mean')
             )
@@ -360,20 +356,10 @@ class TimeAuditCycle(BaseCycle):
             if automation_candidates_df.empty:
                 return []
             
-            # Формируем результат
-            automation_candidates = automation_candidates_df.to_dict('records')
-            
-            # Приводим к нужному формату
-            result = []
-            for candidate in automation_candidates:
-                result.append({
-                    'task_id': str(candidate.get('task_id', 'unknown')),
-                    'title': str(candidate.get('title', 'Без названия')),
-                    'repetition_count': int(candidate.get('repetition_count', 0)),
-                    'avg_duration': float(candidate.get('avg_duration', 0))
-                })
-            
-            return result
+            # Приводим типы целыми колонками и формируем результат одним вызовом to_dict
+            return automation_candidates_df.astype(
+                {'task_id': str, 'title': str, 'repetition_count': int, 'avg_duration': float}
+            ).to_dict('records')
             
         except Exception as e:
             logger.error(f"Error finding automation candidates: {e}")
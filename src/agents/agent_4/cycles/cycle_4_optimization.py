@@ -5,13 +5,21 @@
 """
 from datetime import datetime, timedelta
 import logging
+from types import MappingProxyType
 import pandas as pd
-from typing import Dict, List
+from typing import ClassVar, Dict, List, Mapping
 from .base_cycle import BaseCycle
 
 logger = logging.getLogger(__name__)
 
 class OptimizationCycle(BaseCycle):
+    # Целевые значения KPI, общие для всех экземпляров (только для чтения)
+    KPI_TARGETS: ClassVar[Mapping[str, float]] = MappingProxyType({
+        'response_time': 3600,  # 1 час
+        'automation_rate': 0.7,  # 70%
+        'success_rate': 0.95    # 95%
+    })
+    
     def __init__(self, alert_system=None, database=None, telegram_bot=None):
         """
         Инициализация цикла оптимизации
@@ -25,15 +33,15 @@ class OptimizationCycle(BaseCycle):
         self.alert_system = alert_system
         self.database = database
         self.telegram_bot = telegram_bot  # Для обратной совместимости
-        self.kpi_targets = {
-            'response_time': 3600,  # 1 час
-            'automation_rate': 0.7,  # 70%
-            'success_rate': 0.95    # 95%
-        }
         
         if telegram_bot and not alert_system:
             logger.warning("Использование telegram_bot устарело, используйте alert_system")
             self.alert_system = telegram_bot
+    
+    @property
+    def kpi_targets(self) -> Mapping[str, float]:
+        """Целевые значения KPI"""
+        return self.KPI_TARGETS
 
     # Остальные методы остаются без изменений
     # ...
@@ -3,14 +3,96 @@
 Планирование оптимизаций на неделю
 Запускается каждый понедельник в 08:00
 """
+from collections import ChainMap, OrderedDict, defaultdict
 from datetime import datetime, timedelta
+import heapq
 import logging
 from typing import Dict, List
+import numpy as np
 import pandas as pd
 from .base_cycle import BaseCycle
 
 logger = logging.getLogger(__name__)
 
+# Сколько последних недель хранить в кэше анализа
+CACHE_SIZE = 4
+
+# Колонки записей о времени, возвращаемых БД
+TIME_DATA_COLUMNS = ['date', 'duration', 'category', 'process']
+
+# Категории плана автоматизаций в порядке срочности
+PLAN_CATEGORIES = ('quick_wins', 'medium_term', 'long_term')
+
+# Приоритет задач для каждой категории плана
+TASK_PRIORITIES = tuple(zip(PLAN_CATEGORIES, ('high', 'medium', 'low')))
+
+# Категория плана по сложности задачи (остальные - долгосрочные)
+COMPLEXITY_CATEGORIES = {'easy': 'quick_wins', 'medium': 'medium_term'}
+
+# Сколько лучших задач оставлять в каждой категории плана
+CATEGORY_LIMITS = {
+    'quick_wins': 5,    # Топ-5 быстрых побед
+    'medium_term': 3,   # Топ-3 средних задачи
+    'long_term': 2      # Топ-2 долгосрочные задачи
+}
+
+# Шаблон описания задачи автоматизации
+TASK_DESCRIPTION_TEMPLATE = (
+    "# Задача автоматизации\n"
+    "\n"
+    "## Текущий процесс\n"
+    "{current_process}\n"
+    "\n"
+    "## Проблема\n"
+    "{problem}\n"
+    "\n"
+    "## Ожидаемый результат\n"
+    "{expected_outcome}\n"
+    "\n"
+    "## Метрики успеха\n"
+    "{metrics}\n"
+    "\n"
+    "## Оценка экономии\n"
+    "- Время: {estimated_time_saving} часов в неделю\n"
+    "- ROI: {estimated_roi}"
+)
+
+# Значения полей описания по умолчанию
+TASK_DESCRIPTION_DEFAULTS = {
+    'current_process': 'Нет описания',
+    'problem': 'Не указана',
+    'expected_outcome': 'Не указан',
+    'estimated_time_saving': '0',
+    'estimated_roi': 'Не рассчитан'
+}
+
+# Шаблон недельного плана; списки задач подставляются готовыми строками "\n- ..."
+WEEKLY_PLAN_TEMPLATE = (
+    "📅 План автоматизации на неделю\n"
+    "\n"
+    "\n"
+    "📊 Итоги прошлой недели:\n"
+    "- Обработано задач: {total_tasks}\n"
+    "- Среднее время ответа: {avg_response_time}\n"
+    "- Уровень автоматизации: {automation_rate}%\n"
+    "\n"
+    "\n"
+    "🎯 План на неделю:\n"
+    "\n"
+    "1️⃣ Quick Wins (быстрые победы):{high_tasks}\n"
+    "\n"
+    "2️⃣ Средний приоритет:{medium_tasks}\n"
+    "\n"
+    "💰 Ожидаемая экономия:\n"
+    "- Время: {time_per_week} часов в неделю\n"
+    "- Деньги: {money_per_month:,.0f} руб/месяц\n"
+    "- Эффективность: +{efficiency_gain:.1f}%"
+)
+
+# Вес сложности автоматизации (остальные значения считаются сложными)
+COMPLEXITY_WEIGHTS = {'easy': 1, 'medium': 2}
+HARD_COMPLEXITY_WEIGHT = 3
+
 class PlanningCycle(BaseCycle):
     def __init__(self, database=None, telegram_bot=None, task_manager=None):
         """
@@ -25,6 +107,7 @@ class PlanningCycle(BaseCycle):
         self.database = database
         self.telegram_bot = telegram_bot
         self.task_manager = task_manager
+        self._weekly_cache = OrderedDict()  # Кэш анализа по (год, ISO неделя)
         
     def execute(self):
         """Выполнение цикла планирования"""
@@ -38,8 +121,11 @@ class PlanningCycle(BaseCycle):
             # 3. Создание задач
             tasks = self._create_tasks(automation_plan)
             
-            # 4. Отправка плана команде
-            self._send_weekly_plan(weekly_analysis, automation_plan, tasks)
+            # 4. Отправка плана команде (если есть что отправлять)
+            if any(automation_plan.get(category) for category in PLAN_CATEGORIES):
+                self._send_weekly_plan(weekly_analysis, automation_plan, tasks)
+            else:
+                logger.debug("Automation plan is empty, weekly plan not sent")
             
             logger.info("Planning cycle completed successfully")
             
@@ -54,6 +140,13 @@ class PlanningCycle(BaseCycle):
         Returns:
             Dict: Результаты анализа прошлой недели
         """
+        # Повторный запуск в ту же неделю берет готовый анализ
+        week_key = tuple(datetime.now().isocalendar()[:2])
+        cached = self._weekly_cache.get(week_key)
+        if cached is not None:
+            self._weekly_cache.move_to_end(week_key)
+            return cached
+        
         analysis = {
             'time_stats': {},
             'automation_candidates': [],
@@ -66,6 +159,15 @@ class PlanningCycle(BaseCycle):
                 # Получаем статистику из БД
                 analysis = self.database.data.get('weekly_stats', analysis)
                 
+                # Статистика по времени, если ее нет в готовом анализе
+                if not analysis.get('time_stats'):
+                    start_date = (datetime.now() - timedelta(days=7)).replace(
+                        hour=0, minute=0, second=0, microsecond=0
+                    )
+                    analysis['time_stats'] = self._collect_time_statistics(
+                        self._load_time_frame(start_date)
+                    )
+                
                 # Дополнительный анализ, если нужно
                 if not analysis.get('bottlenecks'):
                     analysis['bottlenecks'] = self._identify_bottlenecks(
@@ -74,6 +176,13 @@ class PlanningCycle(BaseCycle):
                 
                 logger.info("Weekly analysis completed successfully")
                 
+                # Кэшируем только анализ из сохраненной статистики, чтобы повторный
+                # запуск после появления weekly_stats увидел новые данные
+                if 'weekly_stats' in self.database.data:
+                    self._weekly_cache[week_key] = analysis
+                    if len(self._weekly_cache) > CACHE_SIZE:
+                        self._weekly_cache.popitem(last=False)
+                
         except Exception as e:
             logger.error(f"Error analyzing previous week: {e}")
             analysis['error'] = str(e)
@@ -90,12 +199,8 @@ class PlanningCycle(BaseCycle):
         Returns:
             Dict: План автоматизаций
         """
-        plan = {
-            'quick_wins': [],
-            'medium_term': [],
-            'long_term': [],
-            'estimated_savings': {}
-        }
+        plan = {category: [] for category in PLAN_CATEGORIES}
+        plan['estimated_savings'] = {}
         
         try:
             # 1. Приоритизация кандидатов
@@ -103,14 +208,11 @@ class PlanningCycle(BaseCycle):
                 weekly_analysis.get('automation_candidates', [])
             )
             
-            # 2. Категоризация по сложности
+            # 2. Категоризация по сложности и отбор лучших задач
             categorized = self._categorize_by_complexity(candidates)
             plan.update(categorized)
             
-            # 3. Расчет приоритетов
-            plan = self._calculate_priorities(plan)
-            
-            # 4. Оценка экономии
+            # 3. Оценка экономии
             plan['estimated_savings'] = self._estimate_savings(plan)
             
             logger.info(
@@ -139,35 +241,23 @@ class PlanningCycle(BaseCycle):
         
         if self.task_manager:
             try:
-                # 1. Создание quick wins
-                for task in automation_plan['quick_wins']:
-                    task_data = self._prepare_task_data(task, priority='high')
-                    created_task = self.task_manager.create_task(
-                        title=task_data['title'],
-                        description=task_data['description'],
-                        priority=task_data['priority']
-                    )
-                    tasks.append(created_task)
-                
-                # 2. Создание средних задач
-                for task in automation_plan['medium_term']:
-                    task_data = self._prepare_task_data(task, priority='medium')
-                    created_task = self.task_manager.create_task(
-                        title=task_data['title'],
-                        description=task_data['description'],
-                        priority=task_data['priority']
-                    )
-                    tasks.append(created_task)
+                # Данные задач в порядке приоритета: quick wins, средние, долгосрочные
+                payloads = []
+                for category, priority in TASK_PRIORITIES:
+                    for task in automation_plan[category]:
+                        task_data = self._prepare_task_data(task, priority=priority)
+                        payloads.append({
+                            'title': task_data['title'],
+                            'description': task_data['description'],
+                            'priority': task_data['priority']
+                        })
                 
-                # 3. Создание долгосрочных задач
-                for task in automation_plan['long_term']:
-                    task_data = self._prepare_task_data(task, priority='low')
-                    created_task = self.task_manager.create_task(
-                        title=task_data['title'],
-                        description=task_data['description'],
-                        priority=task_data['priority']
-                    )
-                    tasks.append(created_task)
+                if hasattr(self.task_manager, 'create_tasks'):
+                    # Пакетное создание одним запросом
+                    tasks = list(self.task_manager.create_tasks(payloads))
+                else:
+                    for payload in payloads:
+                        tasks.append(self.task_manager.create_task(**payload))
                 
                 logger.info(f"Created {len(tasks)} tasks in task manager")
                 
@@ -199,13 +289,48 @@ class PlanningCycle(BaseCycle):
             except Exception as e:
                 logger.error(f"Error sending weekly plan: {e}")
     
-    def _collect_time_statistics(self, start_date: datetime) -> Dict:
+    def _load_time_frame(self, start_date: datetime) -> pd.DataFrame:
         """
-        Сбор статистики по времени за период
+        Загрузка данных о времени за период в DataFrame
         
         Args:
             start_date (datetime): Начальная дата периода
             
+        Returns:
+            pd.DataFrame: Данные о времени начиная с start_date
+        """
+        if self.database and hasattr(self.database, 'query_time_data'):
+            # БД сама отбирает записи за период (WHERE date >= since)
+            rows = self.database.query_time_data(since=start_date)
+            frame = pd.DataFrame(rows, columns=TIME_DATA_COLUMNS)
+        else:
+            time_data = self.database.data.get('time_data', []) if self.database else []
+            frame = pd.DataFrame(time_data)
+            if frame.empty:
+                frame = pd.DataFrame(columns=['date', 'duration'])
+        
+        # Приводим даты к datetime64 и фильтруем период векторной маской
+        frame = frame.assign(date=pd.to_datetime(frame['date'], errors='coerce'))
+        frame = frame[frame['date'] >= start_date]
+        if 'duration' not in frame.columns:
+            frame = frame.assign(duration=0)
+        frame = frame.assign(duration=frame['duration'].fillna(0))
+        
+        # Категории и процессы берутся из небольшого словаря:
+        # храним их как Categorical, чтобы группировка шла по целым кодам
+        for column in ('category', 'process'):
+            if column in frame.columns:
+                frame = frame.assign(**{column: frame[column].astype('category')})
+        
+        return frame
+    
+    def _collect_time_statistics(self, time_frame: pd.DataFrame) -> Dict:
+        """
+        Сбор статистики по времени за период
+        
+        Args:
+            time_frame (pd.DataFrame): Данные о времени за период
+            
         Returns:
             Dict: Статистика по времени
         """
@@ -216,42 +341,25 @@ class PlanningCycle(BaseCycle):
             'trends': {}
         }
         
-        if self.database:
-            try:
-                # Получаем данные из БД
-                time_data = self.database.data.get('time_data', [])
-                
-                # Фильтруем данные за период
-                period_data = [
-                    entry for entry in time_data
-                    if entry['date'] >= start_date
-                ]
-                
-                # Агрегируем данные
-                for entry in period_data:
-                    stats['total_time'] += entry.get('duration', 0)
-                    
-                    # По категориям
-                    category = entry.get('category')
-                    if category:
-                        stats['by_category'][category] = (
-                            stats['by_category'].get(category, 0) +
-                            entry.get('duration', 0)
-                        )
-                    
-                    # По процессам
-                    process = entry.get('process')
-                    if process:
-                        stats['by_process'][process] = (
-                            stats['by_process'].get(process, 0) +
-                            entry.get('duration', 0)
-                        )
-                
-                # Анализ трендов
-                stats['trends'] = self._analyze_trends(period_data)
-                
-            except Exception as e:
-                logger.error(f"Error collecting time statistics: {e}")
+        try:
+            # Агрегируем данные (numpy-скаляр приводим к числу Python для сериализации)
+            total_time = time_frame['duration'].sum()
+            stats['total_time'] = total_time.item() if isinstance(total_time, np.generic) else total_time
+            
+            # По категориям и процессам (строки без ключа не учитываются)
+            for column, key in (('category', 'by_category'), ('process', 'by_process')):
+                if column in time_frame.columns:
+                    stats[key] = (
+                        time_frame.groupby(column, sort=False, observed=True)['duration']
+                        .sum()
+                        .to_dict()
+                    )
+            
+            # Анализ трендов
+            stats['trends'] = self._analyze_trends(time_frame)
+            
+        except Exception as e:
+            logger.error(f"Error collecting time statistics: {e}")
         
         return stats
     
@@ -283,12 +391,12 @@ class PlanningCycle(BaseCycle):
         
         return bottlenecks
     
-    def _analyze_trends(self, time_data: List[Dict]) -> Dict:
+    def _analyze_trends(self, time_frame: pd.DataFrame) -> Dict:
         """
         Анализ трендов во временных данных
         
         Args:
-            time_data (List[Dict]): Данные о времени
+            time_frame (pd.DataFrame): Данные о времени
             
         Returns:
             Dict: Тренды
@@ -298,32 +406,27 @@ class PlanningCycle(BaseCycle):
             'decreasing': []
         }
         
-        try:
-            if len(time_data) >= 2:
-                # Группируем данные по дням
-                daily_data = {}
-                for entry in time_data:
-                    date = entry['date'].date()
-                    daily_data[date] = daily_data.get(date, 0) + entry.get('duration', 0)
-                
-                # Анализируем тренд
-                dates = sorted(daily_data.keys())
-                first_day = daily_data[dates[0]]
-                last_day = daily_data[dates[-1]]
-                
-                # Если разница больше 10%
-                if abs(last_day - first_day) / first_day > 0.1:
-                    if last_day > first_day:
-                        trends['increasing'].append('total_time')
-                    else:
-                        trends['decreasing'].append('total_time')
-                
-        except Exception as e:
-            logger.error(f"Error analyzing trends: {e}")
+        if len(time_frame) < 2:
+            return trends
+        
+        # Группируем данные по дням
+        daily_data = time_frame.set_index('date')['duration'].resample('D').sum()
+        
+        # Анализируем тренд
+        first_day = daily_data.iloc[0]
+        last_day = daily_data.iloc[-1]
+        
+        # Если разница больше 10%
+        if first_day > 0 and abs(last_day - first_day) / first_day > 0.1:
+            if last_day > first_day:
+                trends['increasing'].append('total_time')
+            else:
+                trends['decreasing'].append('total_time')
         
         return trends
     
-    def _prioritize_automation_candidates(self, candidates: List[Dict]) -> List[Dict]:
+    @staticmethod
+    def _prioritize_automation_candidates(candidates: List[Dict]) -> List[Dict]:
         """
         Приоритизация кандидатов на автоматизацию
         
@@ -337,86 +440,68 @@ class PlanningCycle(BaseCycle):
             return []
             
         try:
-            # Расчет score для каждого кандидата
-            for candidate in candidates:
-                frequency = candidate.get('frequency', 0)
-                time_cost = candidate.get('time_cost', 0)
-                complexity = 1
-                
-                if candidate.get('complexity') == 'easy':
-                    complexity = 1
-                elif candidate.get('complexity') == 'medium':
-                    complexity = 2
-                else:
-                    complexity = 3
-                
-                # Score = (частота * время) / сложность
-                candidate['score'] = (frequency * time_cost) / complexity
+            count = len(candidates)
+            frequency = np.fromiter(
+                (c.get('frequency', 0) for c in candidates), dtype=np.float64, count=count
+            )
+            time_cost = np.fromiter(
+                (c.get('time_cost', 0) for c in candidates), dtype=np.float64, count=count
+            )
+            complexity = np.fromiter(
+                (
+                    COMPLEXITY_WEIGHTS.get(c.get('complexity', ''), HARD_COMPLEXITY_WEIGHT)
+                    for c in candidates
+                ),
+                dtype=np.float64,
+                count=count
+            )
+            
+            # Score = (частота * время) / сложность
+            scores = frequency * time_cost / complexity
+            for candidate, score in zip(candidates, scores.tolist()):
+                candidate['score'] = score
             
-            # Сортировка по score
-            return sorted(candidates, key=lambda x: x['score'], reverse=True)
+            # Сортировка по score (стабильная, как sorted)
+            order = np.argsort(-scores, kind='stable')
+            return [candidates[i] for i in order]
             
         except Exception as e:
             logger.error(f"Error prioritizing candidates: {e}")
             return candidates
     
-    def _categorize_by_complexity(self, candidates: List[Dict]) -> Dict:
+    @staticmethod
+    def _categorize_by_complexity(candidates: List[Dict]) -> Dict:
         """
-        Категоризация задач по сложности
+        Категоризация задач по сложности с отбором лучших по score
         
         Args:
             candidates (List[Dict]): Список кандидатов
             
         Returns:
-            Dict: Задачи по категориям
+            Dict: Лучшие задачи по категориям, по убыванию score
         """
-        categorized = {
-            'quick_wins': [],    # Легкие задачи
-            'medium_term': [],   # Средние задачи
-            'long_term': []      # Сложные задачи
-        }
+        heaps: Dict[str, list] = {category: [] for category in PLAN_CATEGORIES}
         
-        for task in candidates:
+        # Один проход с ограниченными кучами вместо сортировки каждой категории
+        for index, task in enumerate(candidates):
             complexity = task.get('complexity', 'medium')
-            if complexity == 'easy':
-                categorized['quick_wins'].append(task)
-            elif complexity == 'medium':
-                categorized['medium_term'].append(task)
-            else:
-                categorized['long_term'].append(task)
-        
-        return categorized
-    
-    def _calculate_priorities(self, plan: Dict) -> Dict:
-        """
-        Расчет приоритетов для задач
-        
-        Args:
-            plan (Dict): План автоматизаций
+            category = COMPLEXITY_CATEGORIES.get(complexity, 'long_term')
+            heap = heaps[category]
             
-        Returns:
-            Dict: План с рассчитанными приоритетами
-        """
-        try:
-            # Сортируем задачи по score внутри каждой категории
-            for category in ['quick_wins', 'medium_term', 'long_term']:
-                plan[category] = sorted(
-                    plan[category],
-                    key=lambda x: x.get('score', 0),
-                    reverse=True
-                )
-            
-            # Ограничиваем количество задач в каждой категории
-            plan['quick_wins'] = plan['quick_wins'][:5]  # Топ-5 быстрых побед
-            plan['medium_term'] = plan['medium_term'][:3]  # Топ-3 средних задачи
-            plan['long_term'] = plan['long_term'][:2]  # Топ-2 долгосрочные задачи
-            
-        except Exception as e:
-            logger.error(f"Error calculating priorities: {e}")
+            # При равном score остаются задачи, идущие раньше в списке
+            entry = (task.get('score', 0), -index, task)
+            if len(heap) < CATEGORY_LIMITS[category]:
+                heapq.heappush(heap, entry)
+            else:
+                heapq.heappushpop(heap, entry)
         
-        return plan
+        return {
+            category: [entry[2] for entry in sorted(heap, reverse=True)]
+            for category, heap in heaps.items()
+        }
     
-    def _estimate_savings(self, plan: Dict) -> Dict:
+    @staticmethod
+    def _estimate_savings(plan: Dict) -> Dict:
         """
         Оценка потенциальной экономии
         
@@ -432,30 +517,28 @@ class PlanningCycle(BaseCycle):
             'efficiency_gain': 0
         }
         
-        try:
-            # 1. Расчет экономии времени
-            for category in ['quick_wins', 'medium_term', 'long_term']:
-                for task in plan[category]:
-                    weekly_time = (
-                        task.get('frequency', 0) *
-                        task.get('time_cost', 0) / 3600  # переводим в часы
-                    )
-                    savings['time_per_week'] += weekly_time
-            
-            # 2. Расчет экономии денег (условно 1000 руб/час)
-            savings['money_per_month'] = (
-                savings['time_per_week'] * 4 * 1000  # 4 недели в месяце
-            )
-            
-            # 3. Оценка повышения эффективности
-            total_tasks = len(plan['quick_wins']) + len(plan['medium_term']) + len(plan['long_term'])
-            if total_tasks > 0:
-                savings['efficiency_gain'] = (
-                    savings['time_per_week'] * 100 / (40 * total_tasks)  # 40 часов в неделю
+        categories = [plan.get(category, []) for category in PLAN_CATEGORIES]
+        total_tasks = sum(len(tasks) for tasks in categories)
+        
+        # 1. Расчет экономии времени
+        for tasks in categories:
+            for task in tasks:
+                weekly_time = (
+                    task.get('frequency', 0) *
+                    task.get('time_cost', 0) / 3600  # переводим в часы
                 )
-            
-        except Exception as e:
-            logger.error(f"Error estimating savings: {e}")
+                savings['time_per_week'] += weekly_time
+        
+        # 2. Расчет экономии денег (условно 1000 руб/час)
+        savings['money_per_month'] = (
+            savings['time_per_week'] * 4 * 1000  # 4 недели в месяце
+        )
+        
+        # 3. Оценка повышения эффективности
+        if total_tasks:
+            savings['efficiency_gain'] = (
+                savings['time_per_week'] * 100 / (40 * total_tasks)  # 40 часов в неделю
+            )
         
         return savings
     
@@ -479,7 +562,8 @@ class PlanningCycle(BaseCycle):
             'metrics': task.get('metrics', [])
         }
     
-    def _generate_task_description(self, task: Dict) -> str:
+    @staticmethod
+    def _generate_task_description(task: Dict) -> str:
         """
         Генерация описания задачи
         
@@ -489,22 +573,11 @@ class PlanningCycle(BaseCycle):
         Returns:
             str: Описание задачи
         """
-        description = [
-            f"# Задача автоматизации\n",
-            f"## Текущий процесс",
-            task.get('current_process', 'Нет описания'),
-            f"\n## Проблема",
-            task.get('problem', 'Не указана'),
-            f"\n## Ожидаемый результат",
-            task.get('expected_outcome', 'Не указан'),
-            f"\n## Метрики успеха",
-            "\n".join([f"- {m}" for m in task.get('metrics', ['Не указаны'])]),
-            f"\n## Оценка экономии",
-            f"- Время: {task.get('estimated_time_saving', '0')} часов в неделю",
-            f"- ROI: {task.get('estimated_roi', 'Не рассчитан')}"
-        ]
-        
-        return "\n".join(description)
+        metrics = "\n".join(f"- {m}" for m in task.get('metrics', ['Не указаны']))
+        
+        return TASK_DESCRIPTION_TEMPLATE.format_map(
+            ChainMap({'metrics': metrics}, task, TASK_DESCRIPTION_DEFAULTS)
+        )
     
     def _format_weekly_plan(self, analysis: Dict, plan: Dict, tasks: List[Dict]) -> str:
         """
@@ -518,35 +591,21 @@ class PlanningCycle(BaseCycle):
         Returns:
             str: Отформатированное сообщение
         """
-        message = [
-            "📅 План автоматизации на неделю\n",
-            "\n📊 Итоги прошлой недели:",
-            f"- Обработано задач: {analysis['performance_metrics'].get('total_tasks', 0)}",
-            f"- Среднее время ответа: {analysis['performance_metrics'].get('avg_response_time', '0')}",
-            f"- Уровень автоматизации: {analysis['performance_metrics'].get('automation_rate', '0')}%\n",
-            "\n🎯 План на неделю:",
-            "\n1️⃣ Quick Wins (быстрые победы):"
-        ]
-        
-        # Добавление quick wins
-        for task in tasks:
-            if task['priority'] == 'high':
-                message.append(f"- {task['title']}")
-        
-        message.extend([
-            "\n2️⃣ Средний приоритет:"
-        ])
+        metrics = analysis['performance_metrics']
+        savings = plan['estimated_savings']
         
-        # Добавление средних задач
+        # Раскладываем задачи по приоритетам за один проход
+        by_priority = defaultdict(list)
         for task in tasks:
-            if task['priority'] == 'medium':
-                message.append(f"- {task['title']}")
-        
-        message.extend([
-            f"\n💰 Ожидаемая экономия:",
-            f"- Время: {plan['estimated_savings'].get('time_per_week', 0)} часов в неделю",
-            f"- Деньги: {plan['estimated_savings'].get('money_per_month', 0):,.0f} руб/месяц",
-            f"- Эффективность: +{plan['estimated_savings'].get('efficiency_gain', 0):.1f}%"
-        ])
-        
-        return "\n".join(message)
+            by_priority[task['priority']].append(f"\n- {task['title']}")
+        
+        return WEEKLY_PLAN_TEMPLATE.format(
+            total_tasks=metrics.get('total_tasks', 0),
+            avg_response_time=metrics.get('avg_response_time', '0'),
+            automation_rate=metrics.get('automation_rate', '0'),
+            high_tasks="".join(by_priority['high']),
+            medium_tasks="".join(by_priority['medium']),
+            time_per_week=savings.get('time_per_week', 0),
+            money_per_month=savings.get('money_per_month', 0),
+            efficiency_gain=savings.get('efficiency_gain', 0)
+        )
@@ -2,59 +2,60 @@
 Точка входа для запуска Агента 4
 """
 import os
-import time
 import signal
+import threading
 import logging
 import logging.config
-import yaml
+from types import MappingProxyType
 from dotenv import load_dotenv
 from agents.agent_4.agent import Agent4
 
-def setup_logging():
-    """Настройка логирования"""
-    # Создание директории для логов если её нет
-    os.makedirs('data/logs', exist_ok=True)
-    
-    # Базовая конфигурация логирования
-    logging_config = {
-        'version': 1,
-        'disable_existing_loggers': False,
-        'formatters': {
-            'standard': {
-                'format': '%(asctime)s [%(levelname)s] %(name)s: %(message)s'
-            },
+# Событие остановки, устанавливается обработчиком сигналов
+shutdown_event = threading.Event()
+
+# Конфигурация логирования (только для чтения)
+LOGGING_CONFIG = MappingProxyType({
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'standard': {
+            'format': '%(asctime)s [%(levelname)s] %(name)s: %(message)s'
         },
-        'handlers': {
-            'console': {
-                'class': 'logging.StreamHandler',
-                'level': 'INFO',
-                'formatter': 'standard',
-                'stream': 'ext://sys.stdout'
-            },
-            'file': {
-                'class': 'logging.handlers.RotatingFileHandler',
-                'level': 'DEBUG',
-                'formatter': 'standard',
-                'filename': 'data/logs/agent4.log',
-                'maxBytes': 10485760,  # 10MB
-                'backupCount': 5
-            }
+    },
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+            'level': 'INFO',
+            'formatter': 'standard',
+            'stream': 'ext://sys.stdout'
         },
-        'loggers': {
-            '': {  # root logger
-                'handlers': ['console', 'file'],
-                'level': 'INFO',
-                'propagate': True
-            }
+        'file': {
+            'class': 'logging.handlers.RotatingFileHandler',
+            'level': 'DEBUG',
+            'formatter': 'standard',
+            'filename': 'data/logs/agent4.log',
+            'maxBytes': 10485760,  # 10MB
+            'backupCount': 5
+        }
+    },
+    'loggers': {
+        '': {  # root logger
+            'handlers': ['console', 'file'],
+            'level': 'INFO',
+            'propagate': True
         }
     }
-    
-    # Применение конфигурации
-    logging.config.dictConfig(logging_config)
+})
+
+def setup_logging():
+    """Настройка логирования"""
+    # Создание директории для логов если её нет
+    os.makedirs('data/logs', exist_ok=True)
+    logging.config.dictConfig(LOGGING_CONFIG)
 
 def handle_shutdown(signum, frame):
     """Обработчик сигналов остановки"""
-    raise KeyboardInterrupt
+    shutdown_event.set()
 
 def main():
     """Основная функция запуска агента"""
@@ -75,13 +76,10 @@ def main():
         agent = Agent4()
         agent.start()
         
-        # Бесконечный цикл ожидания
+        # Ожидание сигнала остановки без периодических пробуждений
         logger.info("Agent 4 is running in background mode. Press Ctrl+C to stop.")
-        try:
-            while True:
-                time.sleep(1)
-        except KeyboardInterrupt:
-            logger.info("Received shutdown signal")
+        shutdown_event.wait()
+        logger.info("Received shutdown signal")
         
         # Корректное завершение работы
         logger.info("Shutting down Agent 4...")
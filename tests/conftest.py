@@ -4,16 +4,30 @@
 import os
 import pytest
 import logging
+from collections import deque
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Callable, Dict, List, Optional
 
 # Настройка базового логирования для тестов
+# (подробный DEBUG-вывод включается переменной окружения TEST_LOG_DEBUG)
 logging.basicConfig(
-    level=logging.DEBUG,
+    level=logging.DEBUG if os.getenv('TEST_LOG_DEBUG') else logging.WARNING,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 
-@pytest.fixture
+# Фиксированное время для моков: тесты не проверяют отметки времени,
+# поэтому фикстуры не вызывают datetime.now() на каждое сообщение и запрос
+FIXED_NOW = datetime(2024, 1, 1, 12, 0)
+
+def fixed_now() -> datetime:
+    """Часы моков, всегда возвращающие FIXED_NOW"""
+    return FIXED_NOW
+
+# Тесты читают только последнее сообщение/запрос или проверяют, что они были,
+# поэтому фикстуры хранят лишь несколько последних записей
+HISTORY_SIZE = 10
+
+@pytest.fixture(scope="session")
 def mock_config() -> Dict:
     """
     Фикстура с тестовой конфигурацией
@@ -49,112 +63,144 @@ def mock_config() -> Dict:
         }
     }
 
+class MockTelegramBot:
+    """Имитация Telegram бота"""
+    __slots__ = ('messages', 'now_fn')
+    
+    def __init__(self, now_fn: Callable[[], datetime] = datetime.now,
+                 history_size: Optional[int] = None):
+        self.messages = deque(maxlen=history_size)
+        self.now_fn = now_fn
+    
+    def send_message(self, chat_id: str, text: str):
+        self.messages.append({
+            'chat_id': chat_id,
+            'text': text,
+            'timestamp': self.now_fn()
+        })
+        
+    def get_last_message(self) -> Optional[Dict]:
+        return self.messages[-1] if self.messages else None
+
+class MockDatabase:
+    """Имитация базы данных"""
+    __slots__ = ('data', 'queries', 'now_fn', 'error')
+    
+    def __init__(self, now_fn: Callable[[], datetime] = datetime.now,
+                 history_size: Optional[int] = None):
+        self.data = {}
+        self.queries = deque(maxlen=history_size)
+        self.now_fn = now_fn
+        # Исключение, которое execute выбрасывает вместо выполнения запроса
+        self.error: Optional[Exception] = None
+    
+    def execute(self, query: str, params: Dict = None):
+        if self.error is not None:
+            raise self.error
+        self.queries.append({
+            'query': query,
+            'params': params,
+            'timestamp': self.now_fn()
+        })
+        
+    def get_data(self, key: str) -> Optional[Dict]:
+        return self.data.get(key)
+    
+    def set_data(self, key: str, value: Dict):
+        self.data[key] = value
+        
+    def get_last_query(self) -> Optional[Dict]:
+        return self.queries[-1] if self.queries else None
+
+class MockTaskManager:
+    """Имитация системы управления задачами"""
+    __slots__ = ('_by_id', '_next_id', '_clock')
+    
+    def __init__(self):
+        self._by_id = {}
+        self._next_id = 1
+        # Отметки времени - монотонный счетчик операций
+        self._clock = 0
+    
+    def _timestamp(self) -> int:
+        """Отметка времени операции"""
+        self._clock += 1
+        return self._clock
+    
+    @property
+    def tasks(self) -> List[Dict]:
+        """Список задач в порядке создания"""
+        return list(self._by_id.values())
+    
+    def create_task(self, title: str, description: str, priority: str = 'medium'):
+        task_id = self._next_id
+        self._next_id += 1
+        task = {
+            'id': task_id,
+            'title': title,
+            'description': description,
+            'priority': priority,
+            'status': 'new',
+            'created_at': self._timestamp()
+        }
+        self._by_id[task_id] = task
+        return task
+    
+    def get_task(self, task_id: int) -> Optional[Dict]:
+        return self._by_id.get(task_id)
+    
+    def update_task(self, task_id: int, status: str):
+        task = self._by_id.get(task_id)
+        if task:
+            task['status'] = status
+            task['updated_at'] = self._timestamp()
+
 @pytest.fixture
 def mock_telegram_bot():
     """
     Фикстура, имитирующая Telegram бота
     """
-    class MockTelegramBot:
-        def __init__(self):
-            self.messages = []
-        
-        def send_message(self, chat_id: str, text: str):
-            self.messages.append({
-                'chat_id': chat_id,
-                'text': text,
-                'timestamp': datetime.now()
-            })
-            
-        def get_last_message(self) -> Optional[Dict]:
-            return self.messages[-1] if self.messages else None
-    
-    return MockTelegramBot()
+    return MockTelegramBot(now_fn=fixed_now, history_size=HISTORY_SIZE)
 
 @pytest.fixture
 def mock_database():
     """
     Фикстура, имитирующая базу данных
     """
-    class MockDatabase:
-        def __init__(self):
-            self.data = {}
-            self.queries = []
-        
-        def execute(self, query: str, params: Dict = None):
-            self.queries.append({
-                'query': query,
-                'params': params,
-                'timestamp': datetime.now()
-            })
-            
-        def get_data(self, key: str) -> Optional[Dict]:
-            return self.data.get(key)
-        
-        def set_data(self, key: str, value: Dict):
-            self.data[key] = value
-            
-        def get_last_query(self) -> Optional[Dict]:
-            return self.queries[-1] if self.queries else None
-    
-    return MockDatabase()
+    return MockDatabase(now_fn=fixed_now, history_size=HISTORY_SIZE)
 
 @pytest.fixture
 def mock_task_manager():
     """
     Фикстура, имитирующая систему управления задачами
     """
-    class MockTaskManager:
-        def __init__(self):
-            self.tasks = []
-        
-        def create_task(self, title: str, description: str, priority: str = 'medium'):
-            task = {
-                'id': len(self.tasks) + 1,
-                'title': title,
-                'description': description,
-                'priority': priority,
-                'status': 'new',
-                'created_at': datetime.now()
-            }
-            self.tasks.append(task)
-            return task
-        
-        def get_task(self, task_id: int) -> Optional[Dict]:
-            for task in self.tasks:
-                if task['id'] == task_id:
-                    return task
-            return None
-        
-        def update_task(self, task_id: int, status: str):
-            task = self.get_task(task_id)
-            if task:
-                task['status'] = status
-                task['updated_at'] = datetime.now()
-    
     return MockTaskManager()
 
-@pytest.fixture(autouse=True)
-def setup_test_environment(tmp_path):
+@pytest.fixture(scope="session")
+def test_dirs(tmp_path_factory):
+    """
+    Фикстура с каталогами тестового окружения
+    Создает временные директории один раз за сессию
+    """
+    base = tmp_path_factory.mktemp("test_env")
+    for dir_name in ('logs', 'databases', 'temp'):
+        (base / dir_name).mkdir()
+    return base
+
+@pytest.fixture
+def test_env(test_dirs, monkeypatch):
     """
     Фикстура для настройки тестового окружения
-    Создает временные директории для тестов
+    Подключается явно тестами, которым нужны переменные окружения
     """
-    # Создаем временные директории
-    test_dirs = ['logs', 'databases', 'temp']
-    for dir_name in test_dirs:
-        os.makedirs(tmp_path / dir_name, exist_ok=True)
-    
     # Устанавливаем переменные окружения для тестов
-    os.environ['TEST_MODE'] = 'true'
-    os.environ['TEST_DATA_DIR'] = str(tmp_path)
-    
-    yield
+    # (monkeypatch восстановит их после теста)
+    monkeypatch.setenv('TEST_MODE', 'true')
+    monkeypatch.setenv('TEST_DATA_DIR', str(test_dirs))
     
-    # Очистка после тестов
-    os.environ.pop('TEST_MODE', None)
-    os.environ.pop('TEST_DATA_DIR', None)
+    return test_dirs
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_request_data() -> Dict:
     """
     Фикстура с тестовыми данными заявки
@@ -171,7 +217,7 @@ def sample_request_data() -> Dict:
         'time_spent': 0
     }
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_metrics_data() -> Dict:
     """
     Фикстура с тестовыми метриками
@@ -203,11 +249,14 @@ def pytest_collection_modifyitems(config, items):
     Модификация тестовых item'ов
     Пропускает медленные тесты если не указан флаг --runslow
     """
-    if not config.getoption("--runslow"):
-        skip_slow = pytest.mark.skip(reason="need --runslow option to run")
-        for item in items:
-            if "slow" in item.keywords:
-                item.add_marker(skip_slow)
+    if config.getoption("--runslow"):
+        # С флагом --runslow модифицировать нечего
+        return
+    
+    skip_slow = pytest.mark.skip(reason="need --runslow option to run")
+    for item in items:
+        if "slow" in item.keywords:
+            item.add_marker(skip_slow)
 
 def pytest_addoption(parser):
     """
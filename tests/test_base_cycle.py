@@ -2,8 +2,7 @@
 Тесты для базового класса HD циклов
 """
 import pytest
-from datetime import datetime
-import time
+import schedule
 from src.agents.agent_4.cycles.base_cycle import BaseCycle
 
 class TestCycle(BaseCycle):
@@ -16,6 +15,12 @@ class TestCycle(BaseCycle):
         """Тестовая реализация метода execute"""
         self.execute_count += 1
 
+@pytest.fixture(autouse=True)
+def clear_schedule():
+    """Очистка глобального планировщика после каждого теста"""
+    yield
+    schedule.clear()
+
 def test_cycle_initialization():
     """Тест инициализации цикла"""
     cycle = TestCycle(name="Test", interval=5)
@@ -33,8 +38,8 @@ def test_cycle_start_stop():
     cycle.start()
     assert cycle.is_running
     
-    # Ждем немного, чтобы цикл выполнился
-    time.sleep(1.5)
+    # Выполняем тик цикла напрямую вместо ожидания планировщика
+    cycle._run()
     
     # Проверка остановки
     cycle.stop()
@@ -50,8 +55,9 @@ def test_cycle_error_handling():
     cycle = ErrorCycle(name="Error Cycle", interval=1)
     cycle.start()
     
-    # Ждем, чтобы произошло несколько ошибок
-    time.sleep(2)
+    # Выполняем тики, чтобы произошло несколько ошибок
+    for _ in range(2):
+        cycle._run()
     
     # Проверяем, что ошибки подсчитываются
     assert cycle.error_count > 0
@@ -72,7 +78,7 @@ def test_cycle_status():
     
     # Запускаем цикл и проверяем обновление статуса
     cycle.start()
-    time.sleep(1)  # Даем время на выполнение
+    cycle._run()
     cycle.stop()
     
     status = cycle.get_status()
@@ -90,7 +96,11 @@ def test_cycle_max_errors():
     cycle.max_errors = 2  # Устанавливаем низкий порог для теста
     
     cycle.start()
-    time.sleep(3)  # Даем время на накопление ошибок
+    # Выполняем тики, пока цикл не остановится (с ограничением на число итераций)
+    for _ in range(10):
+        if not cycle.is_running:
+            break
+        cycle._run()
     
     # Проверяем, что цикл остановился после превышения max_errors
     assert not cycle.is_running
@@ -101,12 +111,18 @@ def test_cycle_interval_execution():
     cycle = TestCycle(interval=2)
     cycle.start()
     
-    # Проверяем количество выполнений за определенный период
-    time.sleep(5)
+    # Задача зарегистрирована в планировщике с интервалом цикла
+    jobs = schedule.get_jobs()
+    assert len(jobs) == 1
+    assert jobs[0].interval == 2
+    
+    # Каждый тик планировщика соответствует одному выполнению
+    ticks = 3
+    for _ in range(ticks):
+        cycle._run()
     cycle.stop()
     
-    # За 5 секунд с интервалом 2 секунды должно быть 2-3 выполнения
-    assert 2 <= cycle.execute_count <= 3
+    assert cycle.execute_count == ticks
 
 def test_cycle_concurrent_start():
     """Тест повторного запуска цикла"""
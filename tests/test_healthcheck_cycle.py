@@ -1,7 +1,19 @@
+import copy
 import pytest
 from datetime import datetime
+from typing import Dict, NamedTuple
 from src.agents.agent_4.cycles.cycle_3_healthcheck import HealthCheckCycle
 
+class HealthStatus(NamedTuple):
+    """Статус системы в формате, возвращаемом проверками цикла"""
+    healthy: bool
+    message: str
+    timestamp: datetime
+
+def _status(healthy: bool, message: str) -> Dict:
+    """Статус системы в виде словаря, ожидаемого циклом"""
+    return HealthStatus(healthy, message, datetime.now())._asdict()
+
 @pytest.fixture
 def mock_api_client():
     """Фикстура для мока API клиента"""
@@ -21,6 +33,22 @@ def mock_api_client():
     
     return MockApiClient()
 
+@pytest.fixture(scope="session")
+def _health_cycle_template():
+    """Шаблон цикла, создаваемый один раз за сессию"""
+    return HealthCheckCycle()
+
+@pytest.fixture
+def make_cycle(_health_cycle_template):
+    """Фабрика циклов: поверхностная копия шаблона с изменяемым состоянием, сброшенным для теста"""
+    def _make(telegram_bot=None, database=None):
+        cycle = copy.copy(_health_cycle_template)
+        cycle.telegram_bot = telegram_bot
+        cycle.database = database
+        cycle.recovery_attempts = {}
+        return cycle
+    return _make
+
 def test_healthcheck_cycle_initialization(mock_telegram_bot, mock_database):
     """Тест инициализации цикла проверки здоровья"""
     cycle = HealthCheckCycle(
@@ -35,77 +63,63 @@ def test_healthcheck_cycle_initialization(mock_telegram_bot, mock_database):
     assert isinstance(cycle.recovery_attempts, dict)
     assert cycle.max_recovery_attempts == 3
 
-def test_check_api_integrations(mock_telegram_bot, mock_api_client):
+@pytest.mark.parametrize("is_healthy,error_message,expected_message", [
+    (True, None, 'OK'),
+    (False, "Таймаут соединения", "Таймаут соединения"),
+], ids=["healthy", "unhealthy"])
+def test_check_api_integrations(mock_telegram_bot, mock_api_client, make_cycle,
+                                is_healthy, error_message, expected_message):
     """Тест проверки API интеграций"""
-    cycle = HealthCheckCycle(telegram_bot=mock_telegram_bot)
-    
-    # Проверка здоровой системы
-    mock_api_client.set_health(True)
-    status = cycle._check_api_integrations()
-    
-    assert 'telegram_bot' in status
-    assert status['telegram_bot']['healthy']
-    assert status['telegram_bot']['message'] == 'OK'
+    cycle = make_cycle(telegram_bot=mock_telegram_bot)
     
-    # Проверка нездоровой системы
-    mock_api_client.set_health(False, "Таймаут соединения")
+    mock_api_client.set_health(is_healthy, error_message)
     status = cycle._check_api_integrations()
     
     assert 'telegram_bot' in status
-    assert not status['telegram_bot']['healthy']
-    assert "Таймаут соединения" in status['telegram_bot']['message']
+    assert status['telegram_bot']['healthy'] is is_healthy
+    assert expected_message in status['telegram_bot']['message']
 
-def test_check_databases(mock_database):
+@pytest.mark.parametrize("db_error,expected_message", [
+    (None, 'OK'),
+    (Exception("Ошибка подключения к БД"), "Ошибка подключения к БД"),
+], ids=["healthy", "unhealthy"])
+def test_check_databases(mock_database, make_cycle, db_error, expected_message):
     """Тест проверки баз данных"""
-    cycle = HealthCheckCycle(database=mock_database)
+    cycle = make_cycle(database=mock_database)
     
-    # Проверка работающей БД
+    mock_database.error = db_error
     status = cycle._check_databases()
     
     assert 'main_db' in status
-    assert status['main_db']['healthy']
-    assert status['main_db']['message'] == 'OK'
-    
-    # Проверка с ошибкой БД
-    mock_database.execute = lambda *args: exec('raise Exception("Ошибка подключения к БД")')
-    status = cycle._check_databases()
-    
-    assert 'main_db' in status
-    assert not status['main_db']['healthy']
-    assert "Ошибка подключения к БД" in status['main_db']['message']
+    assert status['main_db']['healthy'] is (db_error is None)
+    assert expected_message in status['main_db']['message']
 
-def test_check_running_processes():
+def test_check_running_processes(make_cycle):
     """Тест проверки запущенных процессов"""
-    cycle = HealthCheckCycle()
+    cycle = make_cycle()
     
     status = cycle._check_running_processes()
     assert isinstance(status, dict)
 
-def test_should_attempt_recovery():
+@pytest.mark.parametrize("attempts,expected", [
+    (None, True),  # Первая попытка
+    (2, True),     # Попытки еще остались
+    (3, False),    # Превышен лимит попыток
+])
+def test_should_attempt_recovery(make_cycle, attempts, expected):
     """Тест логики попыток восстановления"""
-    cycle = HealthCheckCycle()
-    
-    # Первая попытка
-    assert cycle._should_attempt_recovery('test_system')
+    cycle = make_cycle()
     
-    # Увеличиваем счетчик попыток
-    cycle.recovery_attempts['test_system'] = 2
-    assert cycle._should_attempt_recovery('test_system')
-    
-    # Превышаем лимит попыток
-    cycle.recovery_attempts['test_system'] = 3
-    assert not cycle._should_attempt_recovery('test_system')
+    if attempts is not None:
+        cycle.recovery_attempts['test_system'] = attempts
+    assert cycle._should_attempt_recovery('test_system') is expected
 
-def test_attempt_recovery():
+def test_attempt_recovery(make_cycle):
     """Тест попытки восстановления системы"""
-    cycle = HealthCheckCycle()
+    cycle = make_cycle()
     
     system_name = 'test_system'
-    status = {
-        'healthy': False,
-        'message': 'Система не отвечает',
-        'timestamp': datetime.now()
-    }
+    status = _status(False, 'Система не отвечает')
     
     # Первая попытка восстановления
     cycle._attempt_recovery(system_name, status)
@@ -115,16 +129,12 @@ def test_attempt_recovery():
     cycle._attempt_recovery(system_name, status)
     assert cycle.recovery_attempts[system_name] == 2
 
-def test_escalate_issue(mock_telegram_bot):
+def test_escalate_issue(mock_telegram_bot, make_cycle):
     """Тест эскалации проблемы"""
-    cycle = HealthCheckCycle(telegram_bot=mock_telegram_bot)
+    cycle = make_cycle(telegram_bot=mock_telegram_bot)
     
     system_name = 'critical_system'
-    status = {
-        'healthy': False,
-        'message': 'Критическая ошибка',
-        'timestamp': datetime.now()
-    }
+    status = _status(False, 'Критическая ошибка')
     
     # Эскалация проблемы
     cycle._escalate_issue(system_name, status)
@@ -135,21 +145,13 @@ def test_escalate_issue(mock_telegram_bot):
     assert '🚨 Критическая ошибка!' in last_message['text']
     assert system_name in last_message['text']
 
-def test_save_health_check_results(mock_database):
+def test_save_health_check_results(mock_database, make_cycle):
     """Тест сохранения результатов проверки"""
-    cycle = HealthCheckCycle(database=mock_database)
+    cycle = make_cycle(database=mock_database)
     
     health_status = {
-        'system1': {
-            'healthy': True,
-            'message': 'OK',
-            'timestamp': datetime.now()
-        },
-        'system2': {
-            'healthy': False,
-            'message': 'Ошибка',
-            'timestamp': datetime.now()
-        }
+        'system1': _status(True, 'OK'),
+        'system2': _status(False, 'Ошибка')
     }
     
     cycle._save_health_check_results(health_status)
@@ -158,21 +160,13 @@ def test_save_health_check_results(mock_database):
     last_query = mock_database.get_last_query()
     assert last_query is not None
 
-def test_send_status_report(mock_telegram_bot):
+def test_send_status_report(mock_telegram_bot, make_cycle):
     """Тест отправки отчета о статусе"""
-    cycle = HealthCheckCycle(telegram_bot=mock_telegram_bot)
+    cycle = make_cycle(telegram_bot=mock_telegram_bot)
     
     health_status = {
-        'system1': {
-            'healthy': True,
-            'message': 'OK',
-            'timestamp': datetime.now()
-        },
-        'system2': {
-            'healthy': False,
-            'message': 'Ошибка',
-            'timestamp': datetime.now()
-        }
+        'system1': _status(True, 'OK'),
+        'system2': _status(False, 'Ошибка')
     }
     
     cycle._send_status_report(health_status)
@@ -183,9 +177,9 @@ def test_send_status_report(mock_telegram_bot):
     assert 'Отчет о состоянии систем' in last_message['text']
     assert 'Здоровых систем: 1/2' in last_message['text']
 
-def test_execute_full_cycle(mock_telegram_bot, mock_database, mock_api_client):
+def test_execute_full_cycle(mock_telegram_bot, mock_database, mock_api_client, make_cycle):
     """Тест полного выполнения цикла"""
-    cycle = HealthCheckCycle(
+    cycle = make_cycle(
         telegram_bot=mock_telegram_bot,
         database=mock_database
     )
@@ -200,26 +194,14 @@ def test_execute_full_cycle(mock_telegram_bot, mock_database, mock_api_client):
     assert len(mock_database.queries) > 0  # Были запросы к БД
     assert len(mock_telegram_bot.messages) > 0  # Были отправлены уведомления
 
-def test_handle_failures():
+def test_handle_failures(make_cycle):
     """Тест обработки сбоев"""
-    cycle = HealthCheckCycle()
+    cycle = make_cycle()
     
     health_status = {
-        'system1': {
-            'healthy': False,
-            'message': 'Ошибка 1',
-            'timestamp': datetime.now()
-        },
-        'system2': {
-            'healthy': True,
-            'message': 'OK',
-            'timestamp': datetime.now()
-        },
-        'system3': {
-            'healthy': False,
-            'message': 'Ошибка 2',
-            'timestamp': datetime.now()
-        }
+        'system1': _status(False, 'Ошибка 1'),
+        'system2': _status(True, 'OK'),
+        'system3': _status(False, 'Ошибка 2')
     }
     
     # Обрабатываем сбои
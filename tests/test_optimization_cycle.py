@@ -3,23 +3,15 @@ from datetime import datetime
 from src.agents.agent_4.cycles.cycle_4_optimization import OptimizationCycle
 
 @pytest.fixture
-def mock_database():
-    class MockDatabase:
-        def __init__(self):
-            self.data = {
-                'daily_stats': {
-                    'requests': {'total': 10, 'automated': 7, 'manual': 3},
-                    'response_times': [3000, 4000, 3500],
-                    'automation_rate': 0.7,
-                    'success_rate': 0.95,
-                    'time_saved': 7200
-                }
-            }
-            
-        def execute(self, query, params=None):
-            pass
-            
-    return MockDatabase()
+def mock_database(mock_database):
+    mock_database.data['daily_stats'] = {
+        'requests': {'total': 10, 'automated': 7, 'manual': 3},
+        'response_times': [3000, 4000, 3500],
+        'automation_rate': 0.7,
+        'success_rate': 0.95,
+        'time_saved': 7200
+    }
+    return mock_database
 
 def test_format_report_message():
     cycle = OptimizationCycle()
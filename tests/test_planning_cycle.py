@@ -1,35 +1,13 @@
 """
 Тесты для цикла планирования
 """
+import copy
+import json
 import pytest
 from datetime import datetime, timedelta
-import pandas as pd
 from src.agents.agent_4.cycles.cycle_5_planning import PlanningCycle
 
-@pytest.fixture
-def mock_task_manager():
-    """Фикстура для мока системы управления задачами"""
-    class MockTaskManager:
-        def __init__(self):
-            self.tasks = []
-            
-        def create_task(self, title, description, priority='medium'):
-            task = {
-                'id': len(self.tasks) + 1,
-                'title': title,
-                'description': description,
-                'priority': priority,
-                'created_at': datetime.now()
-            }
-            self.tasks.append(task)
-            return task
-            
-        def get_tasks(self):
-            return self.tasks
-    
-    return MockTaskManager()
-
-@pytest.fixture
+@pytest.fixture(scope="module")
 def sample_weekly_analysis():
     """Фикстура с тестовым недельным анализом"""
     return {
@@ -79,7 +57,7 @@ def sample_weekly_analysis():
         ]
     }
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def sample_automation_plan():
     """Фикстура с тестовым планом автоматизации"""
     return {
@@ -114,6 +92,11 @@ def sample_automation_plan():
         }
     }
 
+@pytest.fixture(scope="module")
+def plan_cycle():
+    """Цикл без внешних зависимостей для тестов чистых методов"""
+    return PlanningCycle()
+
 def test_planning_cycle_initialization(mock_database, mock_telegram_bot, mock_task_manager):
     """Тест инициализации цикла планирования"""
     cycle = PlanningCycle(
@@ -143,11 +126,107 @@ def test_analyze_previous_week(mock_database, sample_weekly_analysis):
     assert 'performance_metrics' in analysis
     assert 'bottlenecks' in analysis
 
-def test_plan_automations(sample_weekly_analysis):
+def test_analyze_previous_week_cached(mock_database, sample_weekly_analysis):
+    """Тест повторного анализа в течение той же недели"""
+    cycle = PlanningCycle(database=mock_database)
+    mock_database.data['weekly_stats'] = sample_weekly_analysis
+
+    analysis = cycle._analyze_previous_week()
+
+    # Повторный вызов не перечитывает данные из БД
+    mock_database.data['weekly_stats'] = {}
+    assert cycle._analyze_previous_week() is analysis
+
+def test_analyze_previous_week_retry_after_stats(mock_database, sample_weekly_analysis):
+    """Тест повторного анализа после появления статистики в БД"""
+    cycle = PlanningCycle(database=mock_database)
+
+    # Без weekly_stats анализ строится по умолчанию и не кэшируется
+    assert cycle._analyze_previous_week()['automation_candidates'] == []
+
+    mock_database.data['weekly_stats'] = sample_weekly_analysis
+    analysis = cycle._analyze_previous_week()
+
+    assert analysis['automation_candidates'] == sample_weekly_analysis['automation_candidates']
+
+def test_collect_time_statistics(mock_database):
+    """Тест сбора статистики по времени за период"""
+    cycle = PlanningCycle(database=mock_database)
+
+    start_date = datetime(2024, 1, 1)
+    mock_database.data['time_data'] = [
+        {'date': datetime(2023, 12, 31), 'duration': 500, 'category': 'support', 'process': 'triage'},
+        {'date': datetime(2024, 1, 1, 9), 'duration': 3600, 'category': 'development', 'process': 'code_review'},
+        {'date': datetime(2024, 1, 2, 9), 'duration': 1800, 'category': 'development', 'process': 'bug_fixing'},
+        {'date': datetime(2024, 1, 3, 9), 'duration': 7200, 'category': 'meetings'}
+    ]
+
+    stats = cycle._collect_time_statistics(cycle._load_time_frame(start_date))
+
+    assert stats['total_time'] == 12600
+    assert type(stats['total_time']) is int
+    json.dumps(stats)
+    assert stats['by_category'] == {'development': 5400, 'meetings': 7200}
+    assert stats['by_process'] == {'code_review': 3600, 'bug_fixing': 1800}
+    assert stats['trends']['increasing'] == ['total_time']
+
+    # Пустой период дает те же ключи трендов, что и непустой
+    mock_database.data['time_data'] = []
+    stats = cycle._collect_time_statistics(cycle._load_time_frame(start_date))
+
+    assert stats['total_time'] == 0
+    assert stats['by_category'] == {}
+    assert stats['trends'] == {'increasing': [], 'decreasing': []}
+
+def test_load_time_frame_reads_fresh_data(mock_database):
+    """Тест повторной загрузки DataFrame после появления новых данных"""
+    cycle = PlanningCycle(database=mock_database)
+    mock_database.data['time_data'] = [
+        {'date': datetime(2024, 1, 2), 'duration': 3600}
+    ]
+
+    assert len(cycle._load_time_frame(datetime(2024, 1, 1))) == 1
+
+    mock_database.data['time_data'].append({'date': datetime(2024, 1, 3), 'duration': 1800})
+    assert len(cycle._load_time_frame(datetime(2024, 1, 1))) == 2
+
+def test_load_time_frame_from_query():
+    """Тест выборки данных о времени через запрос к БД"""
+    class QueryDatabase:
+        def __init__(self):
+            self.since = None
+
+        def query_time_data(self, since):
+            self.since = since
+            return [(datetime(2024, 1, 2), 3600, 'development', 'code_review')]
+
+    database = QueryDatabase()
+    cycle = PlanningCycle(database=database)
+
+    stats = cycle._collect_time_statistics(cycle._load_time_frame(datetime(2024, 1, 1)))
+
+    assert database.since == datetime(2024, 1, 1)
+    assert stats['total_time'] == 3600
+    assert stats['by_process'] == {'code_review': 3600}
+
+def test_analyze_trends(mock_database):
+    """Тест анализа трендов по дням"""
+    cycle = PlanningCycle(database=mock_database)
+    mock_database.data['time_data'] = [
+        {'date': '2024-01-01 09:00', 'duration': 3600},
+        {'date': '2024-01-01 15:00', 'duration': 3600},
+        {'date': '2024-01-03 10:00', 'duration': 1800}
+    ]
+
+    trends = cycle._analyze_trends(cycle._load_time_frame(datetime(2024, 1, 1)))
+
+    assert trends['decreasing'] == ['total_time']
+    assert trends['increasing'] == []
+
+def test_plan_automations(plan_cycle, sample_weekly_analysis):
     """Тест планирования автоматизаций"""
-    cycle = PlanningCycle()
-    
-    plan = cycle._plan_automations(sample_weekly_analysis)
+    # Планирование дописывает score в кандидатов, поэтому работаем с копией
+    plan = plan_cycle._plan_automations(copy.deepcopy(sample_weekly_analysis))
     
     assert 'quick_wins' in plan
     assert 'medium_term' in plan
@@ -166,10 +245,26 @@ def test_create_tasks(mock_task_manager, sample_automation_plan):
         assert 'description' in task
         assert 'priority' in task
 
-def test_prioritize_automation_candidates():
+def test_create_tasks_bulk(sample_automation_plan):
+    """Тест пакетного создания задач одним запросом"""
+    class BulkTaskManager:
+        def __init__(self):
+            self.calls = []
+
+        def create_tasks(self, payloads):
+            self.calls.append(payloads)
+            return [dict(payload, id=i) for i, payload in enumerate(payloads, 1)]
+
+    task_manager = BulkTaskManager()
+    cycle = PlanningCycle(task_manager=task_manager)
+
+    tasks = cycle._create_tasks(sample_automation_plan)
+
+    assert len(task_manager.calls) == 1
+    assert [task['priority'] for task in tasks] == ['high', 'medium', 'low']
+
+def test_prioritize_automation_candidates(plan_cycle):
     """Тест приоритизации кандидатов на автоматизацию"""
-    cycle = PlanningCycle()
-    
     candidates = [
         {
             'name': 'Task 1',
@@ -185,33 +280,45 @@ def test_prioritize_automation_candidates():
         }
     ]
     
-    prioritized = cycle._prioritize_automation_candidates(candidates)
+    prioritized = plan_cycle._prioritize_automation_candidates(candidates)
     
     assert len(prioritized) == 2
     assert all('score' in task for task in prioritized)
     assert prioritized[0]['score'] >= prioritized[1]['score']
 
-def test_categorize_by_complexity():
+def test_categorize_by_complexity(plan_cycle):
     """Тест категоризации задач по сложности"""
-    cycle = PlanningCycle()
-    
     tasks = [
         {'name': 'Task 1', 'complexity': 'easy'},
         {'name': 'Task 2', 'complexity': 'medium'},
         {'name': 'Task 3', 'complexity': 'hard'}
     ]
     
-    categorized = cycle._categorize_by_complexity(tasks)
+    categorized = plan_cycle._categorize_by_complexity(tasks)
     
     assert len(categorized['quick_wins']) == 1
     assert len(categorized['medium_term']) == 1
     assert len(categorized['long_term']) == 1
 
-def test_estimate_savings(sample_automation_plan):
+def test_categorize_by_complexity_limits(plan_cycle):
+    """Тест отбора лучших задач в каждой категории"""
+    tasks = [
+        {'name': f'Easy {i}', 'complexity': 'easy', 'score': score}
+        for i, score in enumerate([10, 50, 30, 50, 20, 40, 5])
+    ]
+    tasks.append({'name': 'Hard', 'complexity': 'hard', 'score': 1})
+
+    categorized = plan_cycle._categorize_by_complexity(tasks)
+
+    assert [task['name'] for task in categorized['quick_wins']] == [
+        'Easy 1', 'Easy 3', 'Easy 5', 'Easy 2', 'Easy 4'
+    ]
+    assert categorized['medium_term'] == []
+    assert [task['name'] for task in categorized['long_term']] == ['Hard']
+
+def test_estimate_savings(plan_cycle, sample_automation_plan):
     """Тест оценки потенциальной экономии"""
-    cycle = PlanningCycle()
-    
-    savings = cycle._estimate_savings(sample_automation_plan)
+    savings = plan_cycle._estimate_savings(sample_automation_plan)
     
     assert 'time_per_week' in savings
     assert 'money_per_month' in savings
@@ -220,10 +327,8 @@ def test_estimate_savings(sample_automation_plan):
     assert isinstance(savings['money_per_month'], (int, float))
     assert isinstance(savings['efficiency_gain'], (int, float))
 
-def test_prepare_task_data():
+def test_prepare_task_data(plan_cycle):
     """Тест подготовки данных задачи"""
-    cycle = PlanningCycle()
-    
     task = {
         'name': 'Test Task',
         'estimated_time': '4h',
@@ -231,7 +336,7 @@ def test_prepare_task_data():
         'metrics': ['Metric 1', 'Metric 2']
     }
     
-    task_data = cycle._prepare_task_data(task, priority='high')
+    task_data = plan_cycle._prepare_task_data(task, priority='high')
     
     assert 'title' in task_data
     assert 'description' in task_data
@@ -239,10 +344,8 @@ def test_prepare_task_data():
     assert task_data['priority'] == 'high'
     assert 'Test Task' in task_data['title']
 
-def test_generate_task_description():
+def test_generate_task_description(plan_cycle):
     """Тест генерации описания задачи"""
-    cycle = PlanningCycle()
-    
     task = {
         'name': 'Test Task',
         'current_process': 'Current process description',
@@ -253,7 +356,7 @@ def test_generate_task_description():
         'estimated_roi': '200%'
     }
     
-    description = cycle._generate_task_description(task)
+    description = plan_cycle._generate_task_description(task)
     
     assert 'Задача автоматизации' in description
     assert 'Текущий процесс' in description
@@ -262,10 +365,8 @@ def test_generate_task_description():
     assert 'Метрики успеха' in description
     assert 'Оценка экономии' in description
 
-def test_format_weekly_plan(sample_weekly_analysis, sample_automation_plan):
+def test_format_weekly_plan(plan_cycle, sample_weekly_analysis, sample_automation_plan):
     """Тест форматирования недельного плана"""
-    cycle = PlanningCycle()
-    
     tasks = [
         {
             'title': 'Task 1',
@@ -277,7 +378,7 @@ def test_format_weekly_plan(sample_weekly_analysis, sample_automation_plan):
         }
     ]
     
-    message = cycle._format_weekly_plan(
+    message = plan_cycle._format_weekly_plan(
         sample_weekly_analysis,
         sample_automation_plan,
         tasks
@@ -289,6 +390,7 @@ def test_format_weekly_plan(sample_weekly_analysis, sample_automation_plan):
     assert 'Quick Wins' in message
     assert 'Ожидаемая экономия' in message
 
+@pytest.mark.slow
 def test_execute_full_cycle(
     mock_database,
     mock_telegram_bot,
@@ -303,7 +405,7 @@ def test_execute_full_cycle(
     )
     
     # Подготавливаем тестовые данные
-    mock_database.data['weekly_stats'] = sample_weekly_analysis
+    mock_database.data['weekly_stats'] = copy.deepcopy(sample_weekly_analysis)
     
     # Запускаем полный цикл
     cycle.execute()
@@ -313,5 +415,18 @@ def test_execute_full_cycle(
     assert len(mock_telegram_bot.messages) > 0  # Были отправлены уведомления
     assert len(mock_task_manager.tasks) > 0  # Были созданы задачи
 
+def test_execute_empty_plan_not_sent(mock_database, mock_telegram_bot, mock_task_manager):
+    """Тест пропуска отправки пустого плана"""
+    cycle = PlanningCycle(
+        database=mock_database,
+        telegram_bot=mock_telegram_bot,
+        task_manager=mock_task_manager
+    )
+
+    cycle.execute()
+
+    assert len(mock_telegram_bot.messages) == 0
+    assert mock_task_manager.tasks == []
+
 if __name__ == '__main__':
     pytest.main([__file__])
@@ -4,9 +4,12 @@
 import pytest
 from datetime import datetime, timedelta
 import pandas as pd
-import numpy as np
 from src.agents.agent_4.cycles.cycle_2_time_audit import TimeAuditCycle
 
+# Единая отметка времени для всех данных модуля; не фиксированная дата,
+# так как цикл сравнивает недели относительно текущей даты
+NOW = datetime.now()
+
 @pytest.fixture
 def mock_calendar_client():
     """Фикстура для мока календаря"""
@@ -20,12 +23,12 @@ def mock_calendar_client():
                 if start_date <= event['start'] <= end_date
             ]
             
-        def add_test_event(self, event):
-            self.events.append(event)
+        def add_test_events(self, events):
+            self.events.extend(events)
     
     return MockCalendarClient()
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def sample_time_data():
     """Фикстура с тестовыми данными о времени"""
     return {
@@ -33,7 +36,7 @@ def sample_time_data():
             {
                 'id': 'evt1',
                 'title': 'Daily Standup',
-                'start': datetime.now(),
+                'start': NOW,
                 'duration': timedelta(minutes=15)
             }
         ],
@@ -44,7 +47,7 @@ def sample_time_data():
                 'duration': 45,  # минуты
                 'planned_duration': 30,
                 'category': 'Development',
-                'date': datetime.now().date()
+                'date': NOW.date()
             },
             {
                 'task_id': 'TSK-002',
@@ -52,18 +55,51 @@ def sample_time_data():
                 'duration': 120,
                 'planned_duration': 60,
                 'category': 'Development',
-                'date': datetime.now().date()
+                'date': NOW.date()
             }
         ],
         'activity_logs': [
             {
-                'timestamp': datetime.now(),
+                'timestamp': NOW,
                 'activity': 'Code Review',
                 'duration': 45
             }
         ]
     }
 
+@pytest.fixture(scope="module")
+def wasters_df():
+    """DataFrame с задачами для поиска пожирателей времени"""
+    return pd.DataFrame({
+        'task_id': ['TSK-001', 'TSK-002', 'TSK-003'],
+        'duration': [120, 60, 30],
+        'planned_duration': [60, 60, 30],
+        'title': ['Long Task', 'Normal Task', 'Quick Task']
+    })
+
+@pytest.fixture(scope="module")
+def automation_df():
+    """DataFrame с повторяющимися задачами"""
+    return pd.DataFrame({
+        'task_id': ['TSK-001', 'TSK-001', 'TSK-001', 'TSK-002'],
+        'title': ['Daily Report', 'Daily Report', 'Daily Report', 'Unique Task'],
+        'duration': [30, 30, 30, 45]
+    })
+
+@pytest.fixture(scope="module")
+def weekly_compare_df():
+    """DataFrame с задачами за текущую и предыдущую неделю"""
+    # Колонки собираются заранее, чтобы построить DataFrame одним вызовом без concat
+    return pd.DataFrame({
+        'date': [NOW.date()] * 3 + [(NOW - timedelta(days=7)).date()] * 3,
+        'duration': [60, 45, 30, 50, 40, 25]
+    })
+
+@pytest.fixture(scope="module")
+def audit_cycle():
+    """Цикл без внешних зависимостей для тестов чистых методов"""
+    return TimeAuditCycle()
+
 def test_time_audit_cycle_initialization(mock_calendar_client, mock_database):
     """Тест инициализации цикла аудита времени"""
     cycle = TimeAuditCycle(
@@ -86,8 +122,7 @@ def test_collect_time_data(mock_calendar_client, mock_database, sample_time_data
     
     # Подготавливаем тестовые данные
     mock_database.data['tasks'] = sample_time_data['task_durations']
-    for event in sample_time_data['calendar_events']:
-        mock_calendar_client.add_test_event(event)
+    mock_calendar_client.add_test_events(sample_time_data['calendar_events'])
     
     # Собираем данные
     time_data = cycle._collect_time_data()
@@ -146,62 +181,42 @@ def test_generate_insights(mock_calendar_client, mock_database):
     assert 'potential_time_savings' in insights
     assert isinstance(insights['potential_time_savings'], (int, float))
 
-def test_find_time_wasters():
+def test_find_time_wasters(audit_cycle, wasters_df):
     """Тест поиска пожирателей времени"""
-    cycle = TimeAuditCycle()
-    
-    # Создаем тестовый DataFrame
-    data = {
-        'task_id': ['TSK-001', 'TSK-002', 'TSK-003'],
-        'duration': [120, 60, 30],
-        'planned_duration': [60, 60, 30],
-        'title': ['Long Task', 'Normal Task', 'Quick Task']
-    }
-    df = pd.DataFrame(data)
-    
-    time_wasters = cycle._find_time_wasters(df)
+    time_wasters = audit_cycle._find_time_wasters(wasters_df)
     
     assert len(time_wasters) > 0
     assert time_wasters[0]['task_id'] == 'TSK-001'
     assert time_wasters[0]['excess_time'] == 60
 
-def test_find_automation_candidates():
-    """Тест поиска кандидатов на автоматизацию"""
-    cycle = TimeAuditCycle()
+def test_find_time_wasters_large(audit_cycle):
+    """Тест поиска пожирателей времени на большом DataFrame"""
+    rows = 10000
+    df = pd.DataFrame({
+        'task_id': [f'TSK-{i:05d}' for i in range(rows)],
+        'duration': [60 + i % 3 for i in range(rows)],
+        'planned_duration': [60] * rows,
+        'title': ['Task'] * rows
+    })
     
-    # Создаем тестовый DataFrame с повторяющимися задачами
-    data = {
-        'task_id': ['TSK-001', 'TSK-001', 'TSK-001', 'TSK-002'],
-        'title': ['Daily Report', 'Daily Report', 'Daily Report', 'Unique Task'],
-        'duration': [30, 30, 30, 45]
-    }
-    df = pd.DataFrame(data)
+    time_wasters = audit_cycle._find_time_wasters(df)
     
-    candidates = cycle._find_automation_candidates(df)
+    # Превышение есть у двух задач из каждых трех
+    assert len(time_wasters) == sum(1 for i in range(rows) if i % 3)
+    assert time_wasters[0] == {'task_id': 'TSK-00001', 'excess_time': 1.0, 'title': 'Task'}
+    assert isinstance(time_wasters[-1]['excess_time'], float)
+
+def test_find_automation_candidates(audit_cycle, automation_df):
+    """Тест поиска кандидатов на автоматизацию"""
+    candidates = audit_cycle._find_automation_candidates(automation_df)
     
     assert len(candidates) > 0
     assert candidates[0]['task_id'] == 'TSK-001'
     assert candidates[0]['repetition_count'] == 3
 
-def test_compare_with_previous_week():
+def test_compare_with_previous_week(audit_cycle, weekly_compare_df):
     """Тест сравнения с предыдущей неделей"""
-    cycle = TimeAuditCycle()
-    
-    # Создаем тестовые данные для двух недель
-    current_week = pd.DataFrame({
-        'date': [datetime.now().date()] * 3,
-        'duration': [60, 45, 30]
-    })
-    
-    previous_week = pd.DataFrame({
-        'date': [(datetime.now() - timedelta(days=7)).date()] * 3,
-        'duration': [50, 40, 25]
-    })
-    
-    # Объединяем данные
-    df = pd.concat([current_week, previous_week])
-    
-    comparison = cycle._compare_with_previous_week(df)
+    comparison = audit_cycle._compare_with_previous_week(weekly_compare_df)
     
     assert 'total_time_change' in comparison
     assert 'efficiency_change' in comparison
@@ -230,6 +245,7 @@ def test_save_results(mock_database, sample_time_data):
     last_query = mock_database.get_last_query()
     assert last_query is not None
 
+@pytest.mark.slow
 def test_execute_full_cycle(mock_calendar_client, mock_database, sample_time_data):
     """Тест полного выполнения цикла"""
     cycle = TimeAuditCycle(
@@ -239,8 +255,7 @@ def test_execute_full_cycle(mock_calendar_client, mock_database, sample_time_dat
     
     # Подготавливаем тестовые данные
     mock_database.data['tasks'] = sample_time_data['task_durations']
-    for event in sample_time_data['calendar_events']:
-        mock_calendar_client.add_test_event(event)
+    mock_calendar_client.add_test_events(sample_time_data['calendar_events'])
     
     # Запускаем полный цикл
     cycle.execute()